@@ -3,7 +3,9 @@
 # Organize it in a way that is easy to find people related to each other because:
 # - They worked at the same company for a minimum period of 90 days.
 import bisect
+import copy
 import datetime
+import heapq
 import phonenumbers
 from phonenumbers.phonenumberutil import NumberParseException
 
@@ -92,6 +94,15 @@ class Experience:
         if end_meet - start_meet >= min_days:
             return True
 
+    def overlap_days(self, other, today):
+        """Returns the number of days both experiences overlap, counting ongoing experiences up to today."""
+        start_meet = max(self.start, other.start)
+        end_meet = min(
+            today if self.end is None else self.end,
+            today if other.end is None else other.end,
+        )
+        return max(end_meet - start_meet, 0)
+
     def __lt__(self, other):
         """Comparison method to compare experiences based on start dates."""
         if not isinstance(other, Experience):
@@ -138,6 +149,24 @@ def get_companies_with_history(people, companies_short_list):
     return companies
 
 
+def _experience_keys(person):
+    """Returns what defines the experiences of a person, to find out whether they changed."""
+    return [
+        (experience.company_name, experience.title, experience.start, experience.end)
+        for experience in person.experience
+    ]
+
+
+def get_all_companies_with_history(people):
+    """Same as get_companies_with_history, for every company any person worked for."""
+    all_companies = {
+        experience.company_name
+        for person in people.values()
+        for experience in person.experience
+    }
+    return get_companies_with_history(people, all_companies)
+
+
 def find_connected_person_ids(people, target_id):
     """Returns a list of people that worked at the same company as the target person for at least 90 days.
     The complexity of this function is O(update_experience_with_references) + Et*O(company.colleagues) where
@@ -167,6 +196,32 @@ def find_connected_person_ids(people, target_id):
     return connected_ids
 
 
+def build_phone_book(people):
+    """Returns a dictionary of phone numbers to the person with the lowest id that has that phone.
+    The lowest id, rather than the first person read, keeps the phone book independent of the order of the records.
+    The complexity of this function is O(P) where P is the number of people.
+    """
+    phone_book = {}
+    for id in people:
+        person = people[id]
+        if person.phone is None:
+            continue
+        if person.phone not in phone_book or person.id < phone_book[person.phone].id:
+            phone_book[person.phone] = person
+    return phone_book
+
+
+def build_persons_by_phone(people):
+    """Returns a dictionary of phone numbers to the set of ids of every person that has that phone.
+    The complexity of this function is O(P) where P is the number of people.
+    """
+    persons_by_phone = {}
+    for person in people.values():
+        if person.phone is not None:
+            persons_by_phone.setdefault(person.phone, set()).add(person.id)
+    return persons_by_phone
+
+
 def find_phone_pals_ids(contacts, people, target_id):
     """Returns a set of people that are phone pals with the target person. The key is the target person phone number.
     The complexity of this function is O(P*log(P)+C+log(P)) where C is the number of contacts and P is the number of people.
@@ -174,11 +229,7 @@ def find_phone_pals_ids(contacts, people, target_id):
     target_phone = people[target_id].phone
 
     # Create a directory of people's phones, because it will be needed
-    phone_book = {}
-    for id in people:
-        person = people[id]
-        if person.phone is not None and person.phone not in phone_book:
-            phone_book[person.phone] = person
+    phone_book = build_phone_book(people)
 
     phone_pals_ids = set()
     for contact in contacts:
@@ -191,6 +242,59 @@ def find_phone_pals_ids(contacts, people, target_id):
     return phone_pals_ids
 
 
+def iter_colleague_edges(companies, min_days, today):
+    """Yields (source_id, target_id, "colleague", overlap_days, company_name) tuples, company by company.
+    Each pair of colleagues is yielded once per company, with source_id < target_id and the longest
+    overlap they had at that company. Experiences are sorted by start, so the scan of the later
+    experiences stops as soon as they start too late to overlap min_days with a bounded experience.
+    The complexity is O(sum(Ec^2)) in the worst case, and memory is bounded by the pairs of one company.
+    """
+    for company in companies.values():
+        pairs = {}
+        experiences = company.experiences
+        for i, experience in enumerate(experiences):
+            for j in range(i + 1, len(experiences)):
+                other = experiences[j]
+                if experience.end is not None and other.start > experience.end - min_days:
+                    break  # Every later experience starts even later.
+                if experience.person.id == other.person.id:
+                    continue
+                if not experience.overlaps_at_least(other, min_days):
+                    continue
+                pair = tuple(sorted((experience.person.id, other.person.id)))
+                days = experience.overlap_days(other, today)
+                pairs[pair] = max(days, pairs.get(pair, 0))
+        for (source_id, target_id), days in sorted(pairs.items()):
+            yield (source_id, target_id, "colleague", days, company.name)
+
+
+def iter_phone_pal_edges(people, contacts):
+    """Yields (source_id, target_id, "phone_pal", None, None) tuples, one per pair of phone pals.
+    The source is the owner of the contact, or the lowest id when both have each other as contacts.
+    Like find_phone_pals_ids, the owner is a phone pal of every person having a phone of the contact.
+    The edges are generated owner by owner, so besides the phones of the contacts and of the people,
+    which are proportional to the input, memory is bounded by the phone pals of a single owner.
+    The complexity is O(P+C*log(C)+E) where C is the number of contacts, P the number of people
+    and E the number of phone pal edges.
+    """
+    persons_by_phone = build_persons_by_phone(people)
+    phones_by_owner = {}
+    for contact in contacts:
+        phones_by_owner.setdefault(contact.owner_id, set()).update(contact.phones)
+    for owner_id in sorted(phones_by_owner):
+        owner = people.get(owner_id)
+        owner_phone = None if owner is None else owner.phone
+        target_ids = set()
+        for phone in phones_by_owner[owner_id]:
+            target_ids.update(persons_by_phone.get(phone, ()))
+        for target_id in sorted(target_ids):
+            if target_id == owner_id:
+                continue
+            if target_id < owner_id and owner_phone in phones_by_owner.get(target_id, ()):
+                continue  # Already yielded from the side of target_id.
+            yield (owner_id, target_id, "phone_pal", None, None)
+
+
 def normalize_phone_number(phone_number):
     try:
         parsed_number = phonenumbers.parse(phone_number, "US")
@@ -263,3 +367,445 @@ def find_all_connections(people, contacts, person_id):
     colleagues_ids = find_connected_person_ids(people, person_id)
     phone_pals_ids = find_phone_pals_ids(contacts, people, person_id)
     return colleagues_ids.union(phone_pals_ids)
+
+
+RANKING_ORDERS = ("overlap", "recent")
+
+
+def _rank_connections(person, companies, phone_pals, order, limit, cursor, today):
+    """Returns one page of the connections of a person, best first, and the cursor of the next page.
+    Colleagues rank before phone pals. Colleagues are scored by their longest overlap with the person
+    ("overlap") or by the last day they worked together ("recent"), phone pals are scored 2 when both
+    have each other as contacts and 1 otherwise. Ties are broken by the lowest id.
+    The experiences of the person are visited from the highest possible score down, and the visit stops
+    as soon as the score bound of the next experience cannot beat the limit-th best colleague found so far.
+    The best colleagues are kept in a min-heap of size limit, updated as their scores arrive.
+    Inside a company the experiences are sorted by start, so the scan stops at the first experience
+    starting too late to overlap COLLEAGUE_LIMIT days. Phone pals are only scored when the colleagues
+    do not fill the page.
+    ------
+    phone_pals: dict
+        Whether each phone pal of the person is bidirectional, keyed by id.
+    cursor: tuple
+        The cursor returned with the previous page, None for the first page.
+    """
+    if order not in RANKING_ORDERS:
+        raise ValueError(f"Unsupported ranking order: {order}")
+    if limit < 1:
+        raise ValueError(f"The page limit must be at least 1: {limit}")
+
+    def score_bound(experience):
+        end = today if experience.end is None else experience.end
+        return end - experience.start if order == "overlap" else end
+
+    def is_before_cursor(key):
+        return cursor is None or key < tuple(cursor)
+
+    colleague_ids = set()
+    scores = {}  # Best score of each colleague found so far.
+    # Min-heap of the best colleague keys before the cursor. A key is stale when its colleague has
+    # improved since, or fell out of the page, and live_keys only keeps the current key of each colleague.
+    heap = []
+    live_keys = {}
+
+    def drop_stale_keys():
+        while heap and live_keys.get(-heap[0][2]) != heap[0]:
+            heapq.heappop(heap)
+
+    def refill():
+        """Rebuilds the heap from every score, when a colleague of the page moved to a previous page."""
+        colleague_keys = ((1, score, -id) for id, score in scores.items())
+        heap[:] = heapq.nlargest(limit, filter(is_before_cursor, colleague_keys))
+        heapq.heapify(heap)
+        live_keys.clear()
+        live_keys.update((-key[2], key) for key in heap)
+
+    def offer(colleague_id, score):
+        key = (1, score, -colleague_id)
+        was_live = live_keys.pop(colleague_id, None)  # The previous key of the colleague is stale now.
+        if not is_before_cursor(key):
+            if was_live:
+                refill()  # A colleague rejected for lack of room may belong to the page now.
+            return  # Already on a previous page, with its best score.
+        if len(live_keys) == limit:
+            drop_stale_keys()
+            if key < heap[0]:
+                return
+            del live_keys[-heapq.heappop(heap)[2]]
+        live_keys[colleague_id] = key
+        heapq.heappush(heap, key)
+
+    for target in sorted(person.experience, key=score_bound, reverse=True):
+        if len(live_keys) == limit:
+            drop_stale_keys()
+            if score_bound(target) < heap[0][1]:
+                break  # The remaining experiences have even lower bounds.
+        if target.end and (target.end - target.start) < COLLEAGUE_LIMIT:
+            continue
+        for other in companies[target.company_name].experiences:
+            if target.end is not None and other.start > target.end - COLLEAGUE_LIMIT:
+                break  # Every later experience starts even later.
+            other_id = other.person.id
+            if other_id == person.id or not target.overlaps_at_least(other, COLLEAGUE_LIMIT):
+                continue
+            colleague_ids.add(other_id)
+            if order == "overlap":
+                score = target.overlap_days(other, today)
+            else:
+                score = min(score_bound(target), score_bound(other))
+            if score > scores.get(other_id, -1):
+                scores[other_id] = score
+                offer(other_id, score)
+
+    keys = sorted(live_keys.values(), reverse=True)
+    if len(keys) < limit:
+        pal_keys = (
+            (0, 2 if bidirectional else 1, -id)
+            for id, bidirectional in phone_pals.items()
+            if id not in colleague_ids and id != person.id
+        )
+        keys += heapq.nlargest(limit - len(keys), filter(is_before_cursor, pal_keys))
+    page = [
+        (-id, "colleague" if is_colleague else "phone_pal", score)
+        for is_colleague, score, id in keys
+    ]
+    next_cursor = keys[-1] if len(keys) == limit else None
+    return page, next_cursor
+
+
+def find_ranked_connections(
+    people, contacts, person_id, order="overlap", limit=20, cursor=None, today=None
+):
+    """Returns one page of (id, "colleague" or "phone_pal", score) tuples, best first, and the cursor
+    of the next page (None when there is no more). See _rank_connections for the ranking.
+    Only the companies of the person are built, like find_connected_person_ids.
+    """
+    target_person = people.get(person_id)
+    if target_person is None:
+        print(f"Person with ID {person_id} not found.")
+        return [], None
+    if today is None:
+        today = datetime.date.today().toordinal()
+
+    companies = get_companies_with_history(people, target_person.companies_worked_for())
+    phone_book = build_phone_book(people)
+    in_contacts_of_person = set()
+    has_person_in_contacts = set()
+    for contact in contacts:
+        if contact.owner_id == person_id:
+            for phone in contact.phones:
+                if phone in phone_book:
+                    in_contacts_of_person.add(phone_book[phone].id)
+        elif target_person.phone in contact.phones:
+            has_person_in_contacts.add(contact.owner_id)
+    phone_pals = {
+        id: id in in_contacts_of_person and id in has_person_in_contacts
+        for id in in_contacts_of_person | has_person_in_contacts
+    }
+    return _rank_connections(
+        target_person, companies, phone_pals, order, limit, cursor, today
+    )
+
+
+def _gallop(values, target, lo):
+    """Returns the first position at or after lo where values[position] >= target.
+    Doubles the step from lo before the binary search, so the cost is O(log(d)) where
+    d is the distance from lo to the returned position.
+    """
+    step = 1
+    hi = lo
+    while hi < len(values) and values[hi] < target:
+        lo = hi + 1
+        hi += step
+        step *= 2
+    return bisect.bisect_left(values, target, lo, min(hi, len(values)))
+
+
+def intersect_sorted(a, b):
+    """Returns the sorted list of values present in both sorted lists a and b.
+    Every value of the smaller list is galloped into the larger one, so the complexity is
+    O(m*log(n/m)) where m is the size of the smaller list and n the size of the larger one.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    common = []
+    position = 0
+    for value in a:
+        position = _gallop(b, value, position)
+        if position == len(b):
+            break
+        if b[position] == value:
+            common.append(value)
+            position += 1
+    return common
+
+
+class ConnectionIndex:
+    """Precomputed connections (colleagues and phone pals) of every person, kept as sorted id lists.
+    Answers the same question as find_all_connections, and mutual-connection queries between two people,
+    without rebuilding the companies or rescanning the contacts on every call.
+    Building the index is O(P+C+sum(Ec^2)) where
+        P is the number of people
+        C is the number of contacts
+        Ec is the number of experiences in company c.
+    """
+
+    def __init__(self, people, contacts):
+        self.people = people
+        self.companies = get_all_companies_with_history(people)
+        self.phone_book = build_phone_book(people)
+        self.persons_by_phone = build_persons_by_phone(people)  # The phone book only keeps one person.
+        self.phones_by_owner = {}  # Number of contacts of each owner having each phone.
+        self.owners_by_phone = {}  # Owners that have a phone in one of their contacts.
+        for contact in contacts:
+            counts = self.phones_by_owner.setdefault(contact.owner_id, {})
+            for phone in contact.phones:
+                counts[phone] = counts.get(phone, 0) + 1
+                self.owners_by_phone.setdefault(phone, set()).add(contact.owner_id)
+        self.adjacency = {id: self._compute_connections(id) for id in people}
+        # Connections are not always symmetric (e.g. people sharing a phone), so keep who lists each person.
+        self.listed_by = {}
+        for id, connection_ids in self.adjacency.items():
+            for connection_id in connection_ids:
+                self.listed_by.setdefault(connection_id, set()).add(id)
+
+    def updated(self, people, changed_person_ids, removed_contacts, added_contacts):
+        """Returns a new index for the new people dictionary, leaving this index untouched (copy-on-write).
+        changed_person_ids are the ids of the people added, modified or removed since this index was built,
+        removed_contacts and added_contacts are the old and new versions of the contacts that changed.
+        Only the changed people and the owners of the changed contacts have their connections recomputed.
+        The other people only check whether they list one of them, when they listed them before or
+        may list them now. Everything else is shared with this index.
+        """
+        index = copy.copy(self)
+        index.people = people
+        index.companies = dict(self.companies)
+        index.phone_book = dict(self.phone_book)
+        index.persons_by_phone = dict(self.persons_by_phone)
+        index.phones_by_owner = dict(self.phones_by_owner)
+        index.owners_by_phone = dict(self.owners_by_phone)
+        index.adjacency = dict(self.adjacency)
+        index.listed_by = dict(self.listed_by)
+
+        changed_ids = set(changed_person_ids)
+        recompute_ids = set(changed_ids)
+        check_pairs = set()  # (x, y) pairs where whether x lists y may have changed.
+
+        # Rebuild the companies where a changed person worked, before or after a change of their experience.
+        moved_ids = set()
+        new_experiences = {}
+        for id in changed_ids:
+            old_person = self.people.get(id)
+            new_person = people.get(id)
+            if old_person is not None and new_person is not None:
+                if _experience_keys(old_person) == _experience_keys(new_person):
+                    # Keep the experiences the companies already have. Colleagues are only found by person id.
+                    new_person.experience = old_person.experience
+                    continue
+            moved_ids.add(id)
+            check_pairs.update((x, id) for x in self.listed_by.get(id, ()))
+            for person in (old_person, new_person):
+                for experience in [] if person is None else person.experience:
+                    new_experiences.setdefault(experience.company_name, [])
+            if new_person is not None:
+                for experience in new_person.experience:
+                    new_experiences[experience.company_name].append(experience)
+        for company_name, experiences in new_experiences.items():
+            kept = []
+            if company_name in self.companies:
+                kept = [
+                    experience
+                    for experience in self.companies[company_name].experiences
+                    if experience.person.id not in moved_ids
+                ]
+            for experience in experiences:
+                bisect.insort_left(kept, experience)
+            if kept:
+                company = Company(company_name)
+                company.experiences = kept
+                index.companies[company_name] = company
+            else:
+                index.companies.pop(company_name, None)
+        for id in moved_ids & people.keys():
+            for experience in people[id].experience:
+                for other in index.companies[experience.company_name].experiences:
+                    if other.person.id != id and experience.overlaps_at_least(other, COLLEAGUE_LIMIT):
+                        check_pairs.add((other.person.id, id))
+
+        # Update the phones of the changed people, and who owns them in the phone book.
+        touched_phones = set()
+        for id in changed_ids:
+            old_phone = self.people[id].phone if id in self.people else None
+            new_phone = people[id].phone if id in people else None
+            if old_phone == new_phone:
+                if new_phone is not None and self.phone_book[new_phone].id == id:
+                    index.phone_book[new_phone] = people[id]
+                continue
+            if old_phone is not None:
+                index.persons_by_phone[old_phone] = index.persons_by_phone[old_phone] - {id}
+                touched_phones.add(old_phone)
+            if new_phone is not None:
+                index.persons_by_phone[new_phone] = index.persons_by_phone.get(new_phone, set()) | {id}
+                touched_phones.add(new_phone)
+        for phone in touched_phones:
+            holders = index.persons_by_phone[phone]
+            old_holder = self.phone_book.get(phone)
+            if holders:
+                index.phone_book[phone] = people[min(holders)]  # Like build_phone_book.
+            else:
+                del index.persons_by_phone[phone]
+                del index.phone_book[phone]
+            for owner_id in self.owners_by_phone.get(phone, ()):
+                if old_holder is not None:
+                    check_pairs.add((owner_id, old_holder.id))
+                if holders:
+                    check_pairs.add((owner_id, min(holders)))
+
+        # Remove the old versions of the changed contacts before adding the new ones.
+        changes = [(contact, -1) for contact in removed_contacts] + [(contact, 1) for contact in added_contacts]
+        for contact, delta in changes:
+            owner_id = contact.owner_id
+            counts = dict(index.phones_by_owner.get(owner_id, {}))
+            for phone in contact.phones:
+                counts[phone] = counts.get(phone, 0) + delta
+                if counts[phone] == 0:
+                    del counts[phone]
+                    owners = index.owners_by_phone[phone] - {owner_id}
+                    if owners:
+                        index.owners_by_phone[phone] = owners
+                    else:
+                        del index.owners_by_phone[phone]
+                elif delta == 1 and counts[phone] == 1:
+                    index.owners_by_phone[phone] = index.owners_by_phone.get(phone, set()) | {owner_id}
+                check_pairs.update((x, owner_id) for x in index.persons_by_phone.get(phone, ()))
+            recompute_ids.add(owner_id)
+            if counts:
+                index.phones_by_owner[owner_id] = counts
+            else:
+                index.phones_by_owner.pop(owner_id, None)
+
+        listed_by_changes = {}  # id -> (ids that now list it, ids that no longer list it)
+        for id in recompute_ids:
+            old_connection_ids = set(self.adjacency.get(id, ()))
+            if id in people:
+                index.adjacency[id] = index._compute_connections(id)
+            else:
+                index.adjacency.pop(id, None)
+            new_connection_ids = set(index.adjacency.get(id, ()))
+            for connection_id in new_connection_ids - old_connection_ids:
+                listed_by_changes.setdefault(connection_id, (set(), set()))[0].add(id)
+            for connection_id in old_connection_ids - new_connection_ids:
+                listed_by_changes.setdefault(connection_id, (set(), set()))[1].add(id)
+        for x, y in check_pairs:
+            if x in recompute_ids or x not in people:
+                continue
+            connection_ids = index.adjacency[x]
+            position = bisect.bisect_left(connection_ids, y)
+            was_listed = position < len(connection_ids) and connection_ids[position] == y
+            is_listed = index._lists(x, y)
+            if is_listed and not was_listed:
+                index.adjacency[x] = connection_ids[:position] + [y] + connection_ids[position:]
+                listed_by_changes.setdefault(y, (set(), set()))[0].add(x)
+            elif was_listed and not is_listed:
+                index.adjacency[x] = connection_ids[:position] + connection_ids[position + 1 :]
+                listed_by_changes.setdefault(y, (set(), set()))[1].add(x)
+        for id, (added_ids, removed_ids) in listed_by_changes.items():
+            listed_by = (index.listed_by.get(id, set()) | added_ids) - removed_ids
+            if listed_by:
+                index.listed_by[id] = listed_by
+            else:
+                index.listed_by.pop(id, None)
+        return index
+
+    def _lists(self, person_id, other_id):
+        """Returns whether other_id is in the connections of person_id, as computed by _compute_connections.
+        The complexity is O(Ep*Eo) where Ep and Eo are the numbers of experiences of both people.
+        """
+        person = self.people[person_id]
+        other = self.people.get(other_id)
+        if other is not None:
+            for experience in person.experience:
+                if experience.end and (experience.end - experience.start) < COLLEAGUE_LIMIT:
+                    continue
+                for other_experience in other.experience:
+                    if (
+                        other_experience.company_name == experience.company_name
+                        and other_experience is not experience
+                        and experience.overlaps_at_least(other_experience, COLLEAGUE_LIMIT)
+                    ):
+                        return True
+            if other.phone is not None and other.phone in self.phones_by_owner.get(person_id, ()):
+                if self.phone_book[other.phone].id == other_id:
+                    return True
+        if person.phone is not None and other_id != person_id:
+            return other_id in self.owners_by_phone.get(person.phone, ())
+        return False
+
+    def _compute_connections(self, person_id):
+        """Returns the sorted list of colleagues and phone pals of a person.
+        Matches find_all_connections, in O(Et*AvgEc + Cp) where Cp is the number of phones
+        in the contacts of the person or pointing to them.
+        """
+        person = self.people[person_id]
+        connected_ids = set()
+        for experience in person.experience:
+            company = self.companies[experience.company_name]
+            connected_ids.update(company.colleagues(experience, COLLEAGUE_LIMIT))
+        for phone in self.phones_by_owner.get(person_id, ()):
+            if phone in self.phone_book:
+                connected_ids.add(self.phone_book[phone].id)
+        if person.phone is not None:
+            connected_ids.update(self.owners_by_phone.get(person.phone, set()) - {person_id})
+        return sorted(connected_ids)
+
+    def ranked_connections(self, person_id, order="overlap", limit=20, cursor=None, today=None):
+        """Same as find_ranked_connections, using the precomputed companies and phones."""
+        person = self.people.get(person_id)
+        if person is None:
+            return [], None
+        if today is None:
+            today = datetime.date.today().toordinal()
+        in_contacts_of_person = {
+            self.phone_book[phone].id
+            for phone in self.phones_by_owner.get(person_id, ())
+            if phone in self.phone_book
+        }
+        has_person_in_contacts = set()
+        if person.phone is not None:
+            has_person_in_contacts = self.owners_by_phone.get(person.phone, set()) - {person_id}
+        phone_pals = {
+            id: id in in_contacts_of_person and id in has_person_in_contacts
+            for id in in_contacts_of_person | has_person_in_contacts
+        }
+        return _rank_connections(person, self.companies, phone_pals, order, limit, cursor, today)
+
+    def connections(self, person_id):
+        """Returns the sorted list of connections of a person, empty if the person is unknown."""
+        return self.adjacency.get(person_id, [])
+
+    def mutual_connections(self, id_a, id_b):
+        """Returns the sorted list of connections shared by two people.
+        The complexity is O(m*log(n/m)) where m and n are the sizes of the smaller and larger neighborhoods.
+        """
+        return intersect_sorted(self.connections(id_a), self.connections(id_b))
+
+    def mutual_count(self, id_a, id_b):
+        """Returns the number of connections shared by two people."""
+        return len(self.mutual_connections(id_a, id_b))
+
+    def mutual_counts(self, pairs):
+        """Returns the number of shared connections for each (id_a, id_b) pair, in the same order."""
+        return [self.mutual_count(id_a, id_b) for id_a, id_b in pairs]
+
+    def top_mutual(self, person_id, k):
+        """Returns up to k (id, count) tuples of the people sharing the most connections with a person.
+        The counts are the same as mutual_count. Ties are broken by the lowest id.
+        The complexity is O(sum(Ln) + N*log(k)) where Ln is the number of people listing
+        each connection n of the person, and N is the number of distinct people reached that way.
+        """
+        counts = {}
+        for connection_id in self.connections(person_id):
+            for other_id in self.listed_by.get(connection_id, ()):
+                if other_id != person_id:
+                    counts[other_id] = counts.get(other_id, 0) + 1
+        return heapq.nsmallest(k, counts.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,110 @@
+# Description:
+# Export the whole graph of connections (colleagues and phone pals) to an edge-list file.
+# Edges are generated company by company and contact owner by contact owner, and streamed in
+# batches to a writer thread. Besides the input records and their phones, memory is bounded by
+# the edges of one company or one owner, the batch size and the writer queue.
+import csv
+import datetime
+import gzip
+import io
+import itertools
+import queue
+import struct
+import threading
+from apcrt_connections_utils import (
+    COLLEAGUE_LIMIT,
+    get_all_companies_with_history,
+    iter_colleague_edges,
+    iter_phone_pal_edges,
+)
+
+CSV_HEADER = ["source", "target", "type", "days", "company"]
+EDGE_TYPE_CODES = {"colleague": 0, "phone_pal": 1}
+COMPANY_FIELD_SIZE = 32
+# source, target, type code, overlap days (-1 for phone pals), company name (utf-8, zero padded)
+BINARY_RECORD = struct.Struct(f"<qqBi{COMPANY_FIELD_SIZE}s")
+BATCH_SIZE = 10000  # Number of edges encoded together before handing them to the writer.
+QUEUE_SIZE = 4  # Number of encoded batches that can wait for the writer.
+
+
+def iter_edges(people, contacts, today=None):
+    """Yields every colleague edge, then every phone pal edge, without duplicates."""
+    if today is None:
+        today = datetime.date.today().toordinal()
+    companies = get_all_companies_with_history(people)
+    yield from iter_colleague_edges(companies, COLLEAGUE_LIMIT, today)
+    yield from iter_phone_pal_edges(people, contacts)
+
+
+def encode_csv(edges):
+    """Returns the edges as CSV rows encoded in utf-8."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for source_id, target_id, edge_type, days, company_name in edges:
+        writer.writerow([source_id, target_id, edge_type, "" if days is None else days, company_name or ""])
+    return buffer.getvalue().encode("utf-8")
+
+
+def _truncate_utf8(text, size):
+    """Returns text encoded in utf-8, truncated to size bytes without cutting a character in half."""
+    return text.encode("utf-8")[:size].decode("utf-8", "ignore").encode("utf-8")
+
+
+def encode_binary(edges):
+    """Returns the edges as fixed-width BINARY_RECORD records.
+    Company names longer than the record field are truncated on a character boundary.
+    """
+    return b"".join(
+        BINARY_RECORD.pack(
+            source_id,
+            target_id,
+            EDGE_TYPE_CODES[edge_type],
+            -1 if days is None else days,
+            _truncate_utf8(company_name or "", COMPANY_FIELD_SIZE),
+        )
+        for source_id, target_id, edge_type, days, company_name in edges
+    )
+
+
+def _drain_to_file(output, batches, errors):
+    """Writes the batches from the queue until the None sentinel, remembering the first error."""
+    while (batch := batches.get()) is not None:
+        if not errors:
+            try:
+                output.write(batch)
+            except BaseException as error:
+                errors.append(error)  # Keep draining so the producer never blocks.
+
+
+def write_edges(edges, file_path, format="csv", batch_size=BATCH_SIZE):
+    """Streams the edges to a gzip-compressed CSV file or a fixed-width binary file.
+    Batches are encoded in the calling thread and written (and compressed) in a writer thread.
+    Returns the number of edges written.
+    """
+    if format == "csv":
+        output = gzip.open(file_path, "wb")
+        output.write((",".join(CSV_HEADER) + "\n").encode("utf-8"))
+        encode = encode_csv
+    elif format == "binary":
+        output = open(file_path, "wb")
+        encode = encode_binary
+    else:
+        raise ValueError(f"Unsupported export format: {format}")
+
+    batches = queue.Queue(maxsize=QUEUE_SIZE)
+    errors = []
+    writer = threading.Thread(target=_drain_to_file, args=(output, batches, errors))
+    writer.start()
+    count = 0
+    try:
+        edges = iter(edges)
+        while not errors and (batch := list(itertools.islice(edges, batch_size))):
+            batches.put(encode(batch))
+            count += len(batch)
+    finally:
+        batches.put(None)
+        writer.join()
+        output.close()
+    if errors:
+        raise errors[0]
+    return count
@@ -0,0 +1,174 @@
+# Description:
+# Watch the persons and contacts JSON files of a long-running process, and reload only the
+# records that changed. Files are polled by modification time and size, records are compared
+# by id and content hash, and the differences are applied to a copy of the current snapshot
+# that is swapped in once complete, so queries are always served from a consistent snapshot.
+import hashlib
+import json
+import os
+import threading
+from apcrt_connections_utils import ConnectionIndex, load_contact_records, load_person_records
+
+POLL_INTERVAL = 1.0  # Seconds between two checks of the files.
+
+
+def file_signature(file_path):
+    """Returns the (modification time, size) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def record_hash(record):
+    """Returns a hash of the content of a JSON record that does not depend on the order of its keys."""
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def diff_records(old_hashes, records):
+    """Compares records against the hashes of the previous version of the file.
+    Returns (hashes, changed, removed_ids) where hashes are the new hashes by id, changed are the
+    records added or modified, and removed_ids are the ids that are no longer in the file.
+    """
+    hashes = {}
+    changed = []
+    for record in records:
+        hashes[record["id"]] = digest = record_hash(record)
+        if old_hashes.get(record["id"]) != digest:
+            changed.append(record)
+    removed_ids = old_hashes.keys() - hashes.keys()
+    return hashes, changed, removed_ids
+
+
+class Snapshot:
+    """A consistent version of the people, contacts and connection index.
+    A snapshot is never modified once built, reloads create a new one.
+    """
+
+    def __init__(self, people, contacts_by_id, index, person_hashes, contact_hashes):
+        self.people = people
+        self.contacts_by_id = contacts_by_id
+        self.index = index
+        self.person_hashes = person_hashes
+        self.contact_hashes = contact_hashes
+
+    @property
+    def contacts(self):
+        """The list of contacts, as expected by find_all_connections."""
+        return list(self.contacts_by_id.values())
+
+    @classmethod
+    def load(cls, persons_data, contacts_data):
+        """Builds a snapshot from scratch."""
+        person_hashes, _, _ = diff_records({}, persons_data)
+        contact_hashes, _, _ = diff_records({}, contacts_data)
+        people = load_person_records(persons_data)
+        contacts_by_id = {contact.contact_id: contact for contact in load_contact_records(contacts_data)}
+        index = ConnectionIndex(people, contacts_by_id.values())
+        return cls(people, contacts_by_id, index, person_hashes, contact_hashes)
+
+    def updated(self, persons_data=None, contacts_data=None):
+        """Returns a new snapshot with the records that differ from this one, leaving this one untouched.
+        None means that the file did not change. The cost is proportional to the number of changed records
+        (and the connections they touch), on top of hashing the records.
+        """
+        people = self.people
+        person_hashes = self.person_hashes
+        changed_person_ids = set()
+        if persons_data is not None:
+            person_hashes, changed, removed_ids = diff_records(self.person_hashes, persons_data)
+            if changed or removed_ids:
+                people = dict(self.people)
+                for id in removed_ids:
+                    del people[id]
+                people.update(load_person_records(changed))
+                changed_person_ids = removed_ids | {record["id"] for record in changed}
+
+        contacts_by_id = self.contacts_by_id
+        contact_hashes = self.contact_hashes
+        removed_contacts = []
+        added_contacts = []
+        if contacts_data is not None:
+            contact_hashes, changed, removed_ids = diff_records(self.contact_hashes, contacts_data)
+            if changed or removed_ids:
+                contacts_by_id = dict(self.contacts_by_id)
+                added_contacts = load_contact_records(changed)
+                for contact_id in removed_ids | {contact.contact_id for contact in added_contacts}:
+                    if contact_id in contacts_by_id:
+                        removed_contacts.append(contacts_by_id.pop(contact_id))
+                contacts_by_id.update((contact.contact_id, contact) for contact in added_contacts)
+
+        index = self.index
+        if changed_person_ids or removed_contacts or added_contacts:
+            index = self.index.updated(people, changed_person_ids, removed_contacts, added_contacts)
+        return Snapshot(people, contacts_by_id, index, person_hashes, contact_hashes)
+
+
+def _load_json_data(file_path):
+    with open(file_path, "r") as json_file:
+        return json.load(json_file)
+
+
+class RecordWatcher:
+    """Keeps a snapshot of the persons and contacts files up to date, by polling their modification time and size.
+    Readers take `watcher.snapshot` once per query and keep using that object, the watcher only replaces it
+    with a complete new snapshot.
+    """
+
+    def __init__(self, persons_file_path, contacts_file_path, interval=POLL_INTERVAL):
+        self.persons_file_path = persons_file_path
+        self.contacts_file_path = contacts_file_path
+        self.interval = interval
+        self.persons_signature = file_signature(persons_file_path)
+        self.contacts_signature = file_signature(contacts_file_path)
+        self.snapshot = Snapshot.load(
+            _load_json_data(persons_file_path), _load_json_data(contacts_file_path)
+        )
+        self.last_error = None  # Why the last poll kept the current snapshot, if it failed.
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Reloads the files whose signature changed. Returns True if a new snapshot was swapped in.
+        A file that is missing, not valid JSON (e.g. being written) or has an invalid record keeps the
+        current snapshot, and is retried on the next poll. The error is kept in last_error.
+        """
+        persons_signature = file_signature(self.persons_file_path)
+        contacts_signature = file_signature(self.contacts_file_path)
+        persons_data = contacts_data = None
+        try:
+            if persons_signature is not None and persons_signature != self.persons_signature:
+                persons_data = _load_json_data(self.persons_file_path)
+            if contacts_signature is not None and contacts_signature != self.contacts_signature:
+                contacts_data = _load_json_data(self.contacts_file_path)
+            if persons_data is None and contacts_data is None:
+                return False
+            snapshot = self.snapshot.updated(persons_data, contacts_data)
+        except (OSError, AssertionError, KeyError, TypeError, ValueError) as error:
+            self.last_error = error
+            return False
+        self.last_error = None
+        self.snapshot = snapshot
+        if persons_data is not None:
+            self.persons_signature = persons_signature
+        if contacts_data is not None:
+            self.contacts_signature = contacts_signature
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        """Starts polling in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background polling and waits for the current poll to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
 from apcrt_connections_utils import *
+from apcrt_edge_export import iter_edges, write_edges
 import json
 import argparse
+import datetime
+import sys
 
 FIXED_PERSONS_FILE_NAME = "persons.json"
 FIXED_CONTACTS_FILE_NAME = "contacts.json"
@@ -22,14 +25,65 @@ def print_connections(people, connection_ids):
         print(f"{person.id}: {person.first} {person.last}")
 
 
-if __name__ == "__main__":
+def print_ranked_connections(people, page, order):
+    for person_id, connection_type, score in page:
+        person = people[person_id]
+        if connection_type == "phone_pal":
+            detail = "phone pal, both ways" if score == 2 else "phone pal"
+        elif order == "recent":
+            detail = f"colleague until {datetime.date.fromordinal(score)}"
+        else:
+            detail = f"colleague for {score} days"
+        print(f"{person.id}: {person.first} {person.last} ({detail})")
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
+def parse_arguments(argv):
     parser = argparse.ArgumentParser(
         description="Find colleagues and phone pals of a person per ID."
     )
-    parser.add_argument(
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    find_parser = subparsers.add_parser(
+        "find", help="Find colleagues and phone pals of a person per ID (default)."
+    )
+    find_parser.add_argument(
         "person_id", type=int, help="ID of the person to find colleagues for"
     )
-    args = parser.parse_args()
+    find_parser.add_argument(
+        "--limit",
+        type=positive_int,
+        help="Only show the best LIMIT connections, ranked by --order",
+    )
+    find_parser.add_argument(
+        "--order",
+        choices=RANKING_ORDERS,
+        default="overlap",
+        help="Rank colleagues by longest overlap or most recent shared company",
+    )
+    export_parser = subparsers.add_parser(
+        "export", help="Export every colleague and phone pal edge to a file."
+    )
+    export_parser.add_argument("output", help="Path of the edge-list file to write")
+    export_parser.add_argument(
+        "--format",
+        choices=["csv", "binary"],
+        default="csv",
+        help="gzip-compressed CSV or fixed-width binary records",
+    )
+    # Keep `find_connections.py <person_id>` working without the subcommand.
+    if argv and argv[0] not in subparsers.choices and argv[0] not in ("-h", "--help"):
+        argv = ["find"] + argv
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_arguments(sys.argv[1:])
 
     # Load data from FIXED JSON files
     persons_file_path = FIXED_PERSONS_FILE_NAME
@@ -42,5 +96,15 @@ if __name__ == "__main__":
     people = load_person_records(persons_data)
     contact_records = load_contact_records(contacts_data)
 
-    if connections := find_all_connections(people, contact_records, args.person_id):
+    if args.command == "export":
+        count = write_edges(
+            iter_edges(people, contact_records), args.output, format=args.format
+        )
+        print(f"{count} edges written to {args.output}")
+    elif args.limit is not None:
+        page, _ = find_ranked_connections(
+            people, contact_records, args.person_id, args.order, args.limit
+        )
+        print_ranked_connections(people, page, args.order)
+    elif connections := find_all_connections(people, contact_records, args.person_id):
         print_connections(people, connections)
@@ -179,6 +179,13 @@ class TestExperience(unittest.TestCase):
         exp = Experience(None, None, "Role lb1", 500, 600)
         self.assertTrue(self.unbounded_exp.overlaps_at_least(exp, 90), "Starts after the unbounded experience, end is irrelevant")
 
+    def test_overlap_days(self):
+        exp = Experience(None, None, "Role A", 250, None)
+        self.assertEqual(self.bounded_exp.overlap_days(exp, 1000), 50, "Bounded by the end of the bounded experience")
+        self.assertEqual(self.unbounded_exp.overlap_days(exp, 1000), 750, "Ongoing experiences count up to today")
+        exp = Experience(None, None, "Role B", 400, 600)
+        self.assertEqual(self.bounded_exp.overlap_days(exp, 1000), 0, "No overlap is zero days")
+
 
 class TestContact(unittest.TestCase):
     def test_attributes(self):
@@ -226,5 +233,30 @@ class TestNormalizePhoneNumber(unittest.TestCase):
         self.assertIsNone(result, "None will be normalized to None")
 
 
+class TestPhoneBook(unittest.TestCase):
+    def test_shared_phone_resolves_to_lowest_id(self):
+        # The records are not sorted by id, the phone book must not depend on their order.
+        people = {
+            2: Person(2, "Ken", "Matel", "+16462214505"),
+            1: Person(1, "Barbie", "Matel", "+16462214505"),
+            0: Person(0, "Jane", "Doe", "+15084492121"),
+        }
+        phone_book = build_phone_book(people)
+        self.assertEqual(phone_book["+16462214505"].id, 1, "Shared phones resolve to the lowest id")
+        self.assertEqual(phone_book["+15084492121"].id, 0)
+        contacts = [Contact(0, 0, "Ken", {"+16462214505": {"type": "cell"}})]
+        self.assertEqual(find_phone_pals_ids(contacts, people, 0), {1}, "The owner only lists the lowest id")
+        self.assertEqual(find_phone_pals_ids(contacts, people, 2), {0}, "Every person with the phone lists the owner")
+
+
+class TestIntersectSorted(unittest.TestCase):
+    def test_intersect_sorted(self):
+        self.assertEqual(intersect_sorted([1, 3, 5, 7], [2, 3, 4, 7, 9]), [3, 7])
+        self.assertEqual(intersect_sorted([2, 3, 4, 7, 9], [1, 3, 5, 7]), [3, 7], "Order of the arguments is irrelevant")
+        self.assertEqual(intersect_sorted([], [1, 2, 3]), [], "Nothing is shared with an empty list")
+        self.assertEqual(intersect_sorted([50], list(range(100))), [50], "Galloping must find values far away")
+        self.assertEqual(intersect_sorted([100, 200], list(range(100))), [], "Values past the end are not shared")
+
+
 if __name__ == "__main__":
     unittest.main()
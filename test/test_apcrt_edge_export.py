@@ -0,0 +1,110 @@
+import gzip
+import os
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+from apcrt_connections_utils import *
+from apcrt_edge_export import *
+
+
+class TestEdgeExport(unittest.TestCase):
+    def setUp(self):
+        data = [
+            {"id": 0, "first": "Jane", "last": "Doe", "phone": "+1 (508)4492121", "experience": [
+                {"company": "OrangeCart", "title": "Director", "start": "2017-01-01", "end": None},
+                {"company": "BlueCart", "title": "VP", "start": "2015-01-01", "end": "2017-01-01"}]},
+            {"id": 1, "first": "Barbie", "last": "Matel", "phone": "1-2122635415", "experience": [
+                {"company": "OrangeCart", "title": "Associate", "start": "2017-01-01", "end": "2018-01-01"},
+                {"company": "OrangeCart", "title": "Manager", "start": "2018-01-01", "end": "2018-02-01"}]},
+            {"id": 2, "first": "Ken", "last": "Matel", "phone": "1-6462214505", "experience": [
+                {"company": "BlueCart", "title": "Intern", "start": "2016-12-01", "end": "2017-01-01"}]},
+        ]
+        contact_data = [
+            {"id": 0, "owner_id": 0, "contact_nickname": "Barbie", "phone": [{"number": "(212) 263-5415", "type": "cell"}]},
+            {"id": 1, "owner_id": 1, "contact_nickname": "Jane", "phone": [{"number": "+1(508)4492121", "type": "cell"}]},
+            {"id": 2, "owner_id": 2, "contact_nickname": "Barbie", "phone": [{"number": "+1(212)2635415", "type": "cell"}]},
+        ]
+        self.people = load_person_records(data)
+        self.contacts = load_contact_records(contact_data)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_iter_edges(self):
+        edges = list(iter_edges(self.people, self.contacts))
+        self.assertEqual(
+            edges,
+            [
+                (0, 1, "colleague", 365, "OrangeCart"),  # Once, even with two experiences of Barbie.
+                (0, 1, "phone_pal", None, None),  # Once, even if both have each other as contacts.
+                (2, 1, "phone_pal", None, None),  # The owner of the contact is the source.
+            ],
+            "Ken worked less than 90 days at BlueCart, so he is not a colleague of Jane",
+        )
+
+    def test_iter_edges_with_shared_phone(self):
+        self.people[3] = Person(3, "Allan", "Matel", self.people[1].phone)  # Shares the phone of Barbie
+        edges = [edge for edge in iter_edges(self.people, self.contacts) if edge[2] == "phone_pal"]
+        self.assertIn((0, 3, "phone_pal", None, None), edges, "Jane has the phone of Allan as a contact")
+        self.assertIn((2, 3, "phone_pal", None, None), edges, "Ken has the phone of Allan as a contact")
+        # Every pair of phone pals found by find_phone_pals_ids, from either side, is exported once.
+        pairs = {
+            frozenset((person_id, pal_id))
+            for person_id in self.people
+            for pal_id in find_phone_pals_ids(self.contacts, self.people, person_id)
+            if pal_id != person_id
+        }
+        self.assertEqual(len(edges), len(pairs))
+        self.assertEqual({frozenset(edge[:2]) for edge in edges}, pairs)
+
+    def test_write_csv(self):
+        file_path = os.path.join(self.directory.name, "edges.csv.gz")
+        count = write_edges(iter_edges(self.people, self.contacts), file_path, batch_size=2)
+        self.assertEqual(count, 3)
+        with gzip.open(file_path, "rt") as csv_file:
+            lines = csv_file.read().splitlines()
+        self.assertEqual(lines[0], "source,target,type,days,company")
+        self.assertEqual(lines[1:], ["0,1,colleague,365,OrangeCart", "0,1,phone_pal,,", "2,1,phone_pal,,"])
+
+    def test_write_binary(self):
+        file_path = os.path.join(self.directory.name, "edges.bin")
+        count = write_edges(iter_edges(self.people, self.contacts), file_path, format="binary")
+        self.assertEqual(count, 3)
+        with open(file_path, "rb") as binary_file:
+            records = list(BINARY_RECORD.iter_unpack(binary_file.read()))
+        self.assertEqual(records[0][:4], (0, 1, EDGE_TYPE_CODES["colleague"], 365))
+        self.assertEqual(records[0][4].rstrip(b"\0"), b"OrangeCart")
+        self.assertEqual(records[2][:4], (2, 1, EDGE_TYPE_CODES["phone_pal"], -1))
+
+    def test_encode_binary_truncates_on_character_boundary(self):
+        record = encode_binary([(0, 1, "colleague", 100, "x" * 31 + "é")])
+        company_name = BINARY_RECORD.unpack(record)[4].rstrip(b"\0")
+        self.assertEqual(company_name.decode("utf-8"), "x" * 31, "The two bytes of é do not fit in the field")
+
+    def test_write_error_does_not_block_the_producer(self):
+        class FailingOutput:
+            def __init__(self):
+                self.writes = 0
+
+            def write(self, data):
+                self.writes += 1
+                if self.writes > 1:  # After the header
+                    raise zlib.error("compression failed")
+
+            def close(self):
+                pass
+
+        edges = ((0, id, "phone_pal", None, None) for id in range(1, 1000))
+        with mock.patch("gzip.open", return_value=FailingOutput()):
+            with self.assertRaises(zlib.error):
+                write_edges(edges, os.path.join(self.directory.name, "edges.csv.gz"), batch_size=1)
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            write_edges([], os.path.join(self.directory.name, "edges.xml"), format="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from apcrt_connections_utils import *
+from apcrt_watch import *
+
+PERSONS_DATA = [
+    {"id": 0, "first": "Jane", "last": "Doe", "phone": "+1 (508)4492121", "experience": [
+        {"company": "OrangeCart", "title": "Director", "start": "2017-01-01", "end": None}]},
+    {"id": 1, "first": "Barbie", "last": "Matel", "phone": "1-2122635415", "experience": [
+        {"company": "OrangeCart", "title": "Associate", "start": "2017-01-01", "end": "2018-01-01"}]},
+    {"id": 2, "first": "Ken", "last": "Matel", "phone": "1-6462214505", "experience": [
+        {"company": "BlueCart", "title": "Director", "start": "2018-01-01", "end": None}]},
+]
+CONTACTS_DATA = [
+    {"id": 0, "owner_id": 2, "contact_nickname": "Barbie", "phone": [{"number": "(212) 263-5415", "type": "cell"}]},
+]
+
+
+class TestDiffRecords(unittest.TestCase):
+    def test_diff_records(self):
+        hashes, changed, removed_ids = diff_records({}, PERSONS_DATA)
+        self.assertEqual(len(changed), 3, "Every record is new the first time")
+        self.assertEqual(removed_ids, set())
+        records = copy.deepcopy(PERSONS_DATA[1:])
+        records[0]["last"] = "Roberts"
+        _, changed, removed_ids = diff_records(hashes, records)
+        self.assertEqual(changed, [records[0]], "Only the modified record changed")
+        self.assertEqual(removed_ids, {0})
+
+    def test_record_hash_ignores_key_order(self):
+        self.assertEqual(record_hash({"a": 1, "b": 2}), record_hash({"b": 2, "a": 1}))
+
+
+class TestSnapshot(unittest.TestCase):
+    def assertMatchesFullReload(self, snapshot):
+        index = ConnectionIndex(snapshot.people, snapshot.contacts)
+        self.assertEqual(snapshot.index.adjacency, index.adjacency)
+        for person_id in snapshot.people:
+            self.assertEqual(
+                set(snapshot.index.connections(person_id)),
+                find_all_connections(snapshot.people, snapshot.contacts, person_id),
+            )
+
+    def test_updated(self):
+        snapshot = Snapshot.load(PERSONS_DATA, CONTACTS_DATA)
+        self.assertEqual(snapshot.index.connections(1), [0, 2])
+        persons_data = copy.deepcopy(PERSONS_DATA)
+        persons_data[2]["experience"][0]["company"] = "OrangeCart"  # Ken joins Jane
+        del persons_data[1]  # Barbie leaves
+        contacts_data = CONTACTS_DATA + [
+            {"id": 1, "owner_id": 0, "contact_nickname": "Ken", "phone": [{"number": "+1646-221-4505", "type": "cell"}]},
+        ]
+        updated = snapshot.updated(persons_data, contacts_data)
+        self.assertMatchesFullReload(updated)
+        self.assertEqual(updated.index.connections(2), [0])
+        self.assertEqual(snapshot.index.connections(1), [0, 2], "The previous snapshot is untouched")
+        self.assertIn(1, snapshot.people)
+        self.assertIs(updated.people[0], snapshot.people[0], "Unchanged records are shared")
+
+    def test_updated_with_shared_phone_and_reordered_records(self):
+        persons_data = copy.deepcopy(PERSONS_DATA)
+        persons_data[0]["phone"] = persons_data[1]["phone"]  # Jane and Barbie share a phone
+        snapshot = Snapshot.load(persons_data, CONTACTS_DATA)
+        reordered = list(reversed(persons_data))
+        reordered[0]["last"] = "Roberts"
+        updated = snapshot.updated(reordered, None)
+        self.assertMatchesFullReload(updated)
+        self.assertEqual(updated.index.adjacency, Snapshot.load(reordered, CONTACTS_DATA).index.adjacency)
+
+    def test_updated_recomputes_only_the_changed_people(self):
+        persons_data = [
+            {"id": id, "first": "Jane", "last": "Doe", "phone": None, "experience": [
+                {"company": "OrangeCart", "title": "Clerk", "start": "2017-01-01", "end": None}]}
+            for id in range(50)
+        ]
+        snapshot = Snapshot.load(persons_data, [])
+        compute_connections = ConnectionIndex._compute_connections
+        with mock.patch.object(
+            ConnectionIndex, "_compute_connections", autospec=True, side_effect=compute_connections
+        ) as recompute:
+            persons_data = copy.deepcopy(persons_data)
+            persons_data[7]["last"] = "Roberts"
+            renamed = snapshot.updated(persons_data, None)
+            self.assertEqual(recompute.call_count, 1, "Only the renamed person is recomputed")
+            self.assertIs(renamed.index.companies["OrangeCart"], snapshot.index.companies["OrangeCart"])
+            self.assertMatchesFullReload(renamed)
+
+            recompute.reset_mock()
+            persons_data = copy.deepcopy(persons_data)
+            persons_data[7]["experience"][0]["end"] = "2017-02-01"  # Too short to have colleagues
+            moved = renamed.updated(persons_data, None)
+            self.assertEqual(recompute.call_count, 1, "The colleagues only check whether they still list them")
+            self.assertMatchesFullReload(moved)
+            self.assertNotIn(7, moved.index.connections(0))
+
+    def test_updated_without_changes(self):
+        snapshot = Snapshot.load(PERSONS_DATA, CONTACTS_DATA)
+        updated = snapshot.updated(copy.deepcopy(PERSONS_DATA), None)
+        self.assertIs(updated.index, snapshot.index, "Nothing is rebuilt when no record changed")
+
+
+class TestRecordWatcher(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.persons_file_path = os.path.join(self.directory.name, "persons.json")
+        self.contacts_file_path = os.path.join(self.directory.name, "contacts.json")
+        self.write(self.persons_file_path, PERSONS_DATA)
+        self.write(self.contacts_file_path, CONTACTS_DATA)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, file_path, data):
+        with open(file_path, "w") as json_file:
+            json.dump(data, json_file)
+        self.touch(file_path)
+
+    def touch(self, file_path):
+        """Moves the modification time forward, so rewrites of the same size are seen on coarse filesystems."""
+        stat = os.stat(file_path)
+        self.mtime_ns = max(getattr(self, "mtime_ns", 0), stat.st_mtime_ns) + 10**9
+        os.utime(file_path, ns=(stat.st_atime_ns, self.mtime_ns))
+
+    def test_poll(self):
+        watcher = RecordWatcher(self.persons_file_path, self.contacts_file_path)
+        snapshot = watcher.snapshot
+        self.assertFalse(watcher.poll(), "Nothing to reload while the files do not change")
+        self.write(self.contacts_file_path, [])
+        self.assertTrue(watcher.poll())
+        self.assertIsNot(watcher.snapshot, snapshot, "A new snapshot is swapped in")
+        self.assertEqual(watcher.snapshot.index.connections(1), [0])
+        with open(self.persons_file_path, "w") as json_file:
+            json_file.write("[{")  # Being written
+        self.touch(self.persons_file_path)
+        self.assertFalse(watcher.poll(), "Invalid files are retried on the next poll")
+        self.assertEqual(len(watcher.snapshot.people), 3)
+
+    def test_poll_invalid_record(self):
+        watcher = RecordWatcher(self.persons_file_path, self.contacts_file_path)
+        snapshot = watcher.snapshot
+        persons_data = copy.deepcopy(PERSONS_DATA)
+        persons_data[2]["experience"][0]["start"] = "not-a-date"
+        self.write(self.persons_file_path, persons_data)
+        self.assertFalse(watcher.poll(), "Invalid records keep the current snapshot")
+        self.assertIs(watcher.snapshot, snapshot)
+        self.assertIsInstance(watcher.last_error, ValueError)
+        del persons_data[2]["id"]
+        self.write(self.persons_file_path, persons_data)
+        self.assertFalse(watcher.poll())
+        self.assertIsInstance(watcher.last_error, KeyError)
+        persons_data = copy.deepcopy(PERSONS_DATA)
+        persons_data[2]["last"] = "Roberts"
+        self.write(self.persons_file_path, persons_data)
+        self.assertTrue(watcher.poll(), "The fixed file is picked up on the next poll")
+        self.assertIsNone(watcher.last_error)
+        self.assertEqual(watcher.snapshot.people[2].last, "Roberts")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -164,6 +164,86 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(all_connections, {0, 3, 1})
         all_connections = find_all_connections(self.people, self.contacts, 3)
         self.assertEqual(all_connections, {0, 1, 2})
-    
+
+    def test_connection_index_matches_find_all_connections(self):
+        index = ConnectionIndex(self.people, self.contacts)
+        for person_id in self.people:
+            self.assertEqual(
+                set(index.connections(person_id)),
+                find_all_connections(self.people, self.contacts, person_id),
+            )
+        self.assertEqual(index.connections(42), [], "Unknown people have no connections")
+
+    def test_mutual_connections(self):
+        # Connections on the test data are 0: 1, 2, 3 / 1: 0, 2, 3 / 2: 0, 1, 3 / 3: 0, 1, 2
+        index = ConnectionIndex(self.people, self.contacts)
+        self.assertEqual(index.mutual_connections(0, 1), [2, 3])
+        self.assertEqual(index.mutual_count(2, 3), 2)
+        self.assertEqual(index.mutual_counts([(0, 1), (1, 42)]), [2, 0])
+        self.assertEqual(index.top_mutual(0, 2), [(1, 2), (2, 2)], "Ties are broken by the lowest id")
+
+    def test_top_mutual_with_shared_phone(self):
+        # Barbie gets the phone of Ken, so Allan lists Barbie and Ken as phone pals, but the phone book
+        # only resolves their shared phone to Barbie, and Jane lists no phone pal.
+        self.people[2].phone = self.people[1].phone
+        index = ConnectionIndex(self.people, self.contacts)
+        for person_id in self.people:
+            for other_id, count in index.top_mutual(person_id, 10):
+                self.assertEqual(count, index.mutual_count(person_id, other_id))
+            self.assertEqual(
+                len(index.top_mutual(person_id, 10)),
+                sum(1 for other_id in self.people if other_id != person_id and index.mutual_count(person_id, other_id)),
+                "Everybody sharing a connection is ranked",
+            )
+
+    def test_find_ranked_connections(self):
+        today = datetime.date.fromisoformat("2020-01-01").toordinal()
+        page, cursor = find_ranked_connections(self.people, self.contacts, 0, limit=2, today=today)
+        self.assertEqual(page, [(2, "colleague", 730), (1, "colleague", 365)], "Longest overlap first")
+        page, cursor = find_ranked_connections(self.people, self.contacts, 0, limit=2, cursor=cursor, today=today)
+        self.assertEqual(page, [(3, "colleague", 214)])
+        self.assertIsNone(cursor, "There is no page after the last one")
+        page, _ = find_ranked_connections(self.people, self.contacts, 0, order="recent", limit=1, today=today)
+        self.assertEqual(page, [(2, "colleague", today)], "Ongoing experiences are the most recent")
+        # Barbie and Ken have each other as contacts, only Allan has Barbie as a contact.
+        page, _ = find_ranked_connections(self.people, self.contacts, 1, today=today)
+        self.assertEqual(page, [(0, "colleague", 365), (2, "phone_pal", 2), (3, "phone_pal", 1)])
+        with self.assertRaises(ValueError):
+            find_ranked_connections(self.people, self.contacts, 1, order="alphabetical")
+        with self.assertRaises(ValueError):
+            find_ranked_connections(self.people, self.contacts, 1, limit=0)
+        with self.assertRaises(ValueError):
+            ConnectionIndex(self.people, self.contacts).ranked_connections(1, limit=-1)
+
+    def test_find_ranked_connections_colleague_moving_to_previous_page(self):
+        # Bob looks like the best colleague of Jane at LimeCart, until their longer overlap at KiwiCart
+        # moves him to the first page. Carl, who had no room on the second page, must take his place.
+        data = [
+            {"id": 10, "first": "Jane", "last": "Roe", "phone": None, "experience": [
+                {"company": "LimeCart", "title": "CEO", "start": "2015-01-01", "end": None},
+                {"company": "KiwiCart", "title": "CFO", "start": "2018-01-01", "end": "2020-01-01"}]},
+            {"id": 11, "first": "Bob", "last": "Roe", "phone": None, "experience": [
+                {"company": "LimeCart", "title": "CTO", "start": "2015-01-01", "end": "2015-06-01"},
+                {"company": "KiwiCart", "title": "CTO", "start": "2018-01-01", "end": "2020-01-01"}]},
+            {"id": 12, "first": "Carl", "last": "Roe", "phone": None, "experience": [
+                {"company": "LimeCart", "title": "COO", "start": "2015-01-01", "end": "2015-05-01"}]},
+        ]
+        people = load_person_records(data)
+        today = datetime.date.fromisoformat("2020-01-01").toordinal()
+        page, cursor = find_ranked_connections(people, [], 10, limit=1, today=today)
+        self.assertEqual(page, [(11, "colleague", 730)])
+        page, cursor = find_ranked_connections(people, [], 10, limit=1, cursor=cursor, today=today)
+        self.assertEqual(page, [(12, "colleague", 120)])
+
+    def test_ranked_connections_of_index(self):
+        today = datetime.date.fromisoformat("2020-01-01").toordinal()
+        index = ConnectionIndex(self.people, self.contacts)
+        for person_id in self.people:
+            self.assertEqual(
+                index.ranked_connections(person_id, limit=3, today=today),
+                find_ranked_connections(self.people, self.contacts, person_id, limit=3, today=today),
+            )
+        self.assertEqual(index.ranked_connections(42), ([], None))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file